@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
 
 from app.core.config import Settings, get_settings
 from app.schemas import AttendanceProcessResponse, HistoryItem, HistoryResponse
@@ -34,15 +36,44 @@ async def process_attendance(
     matrix: bool = Form(True),
     service: AttendanceService = Depends(get_attendance_service),
 ) -> AttendanceProcessResponse:
-    return await service.process(
-        attendance_file=attendance_file,
-        gradebook_file=gradebook_file,
-        start_date=start_date,
-        end_date=end_date,
-        out_prefix=out_prefix,
-        join_mode=join_mode,
-        matrix=matrix,
-    )
+    try:
+        return await service.process(
+            attendance_file=attendance_file,
+            gradebook_file=gradebook_file,
+            start_date=start_date,
+            end_date=end_date,
+            out_prefix=out_prefix,
+            join_mode=join_mode,
+            matrix=matrix,
+        )
+    except BrokenProcessPool:
+        raise HTTPException(status_code=500, detail="Processing worker crashed on this upload")
+
+
+@router.get("/artifacts/{filename}")
+async def download_artifact(
+    filename: str,
+    service: AttendanceService = Depends(get_attendance_service),
+) -> FileResponse:
+    try:
+        path = service.resolve_artifact(filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, filename=path.name)
+
+
+@router.get("/artifacts/{filename}/preview", response_model=List[Dict[str, Any]])
+def preview_artifact(
+    filename: str,
+    limit: int = Query(20, ge=1, le=500, description="Number of rows to return"),
+    service: AttendanceService = Depends(get_attendance_service),
+) -> List[Dict[str, Any]]:
+    try:
+        return service.artifact_preview(filename, limit=limit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get("/history", response_model=HistoryResponse)
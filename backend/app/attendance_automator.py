@@ -14,9 +14,9 @@ Features:
 - Idempotent: can run daily; outputs are overwritten safely.
 
 Install (conda or pip):
-    conda install -y pandas numpy pyyaml requests gspread google-api-python-client google-auth google-auth-oauthlib
+    conda install -y pandas numpy pyarrow pyyaml requests gspread google-api-python-client google-auth google-auth-oauthlib
 or
-    pip install pandas numpy pyyaml requests gspread google-api-python-client google-auth google-auth-oauthlib
+    pip install pandas numpy pyarrow pyyaml requests gspread google-api-python-client google-auth google-auth-oauthlib
 
 Usage (local CSV mode):
     python attendance_automator.py process \
@@ -40,6 +40,8 @@ from typing import List, Tuple, Dict, Optional
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 try:
     import yaml
@@ -69,60 +71,158 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 SCOPES = ['https://www.googleapis.com/auth/drive', 'https://www.googleapis.com/auth/spreadsheets']
 
 COMMON_DOMAIN_FIXES = {
-    r"@ucscedu$": "@ucsc.edu",
-    r"@ucsc\\.efu$": "@ucsc.edu",
-    r"@ucsc\\.irg$": "@ucsc.edu",
-    r"@uscs\\.edu$": "@ucsc.edu",
-    r"@gmail\\.con$": "@gmail.com"
+    "@ucscedu": "@ucsc.edu",
+    "@ucsc.efu": "@ucsc.edu",
+    "@ucsc.irg": "@ucsc.edu",
+    "@uscs.edu": "@ucsc.edu",
+    "@gmail.con": "@gmail.com"
 }
+# One alternation over all typo'd suffixes, so each address is scanned once
+_EMAIL_FIX_ALTS = "|".join(re.escape(bad) for bad in COMMON_DOMAIN_FIXES)
+_EMAIL_FIX_RE = re.compile("(" + _EMAIL_FIX_ALTS + ")$")
+_EMAIL_FIX_PREFILTER = "(?:" + _EMAIL_FIX_ALTS + ")$"
+
+def _fix_domain(m):
+    return COMMON_DOMAIN_FIXES[m.group(1)]
 
 def normalize_email(email):
     if pd.isna(email):
         return email
     e = str(email).strip().lower().replace(" ", "")
-    for bad, good in COMMON_DOMAIN_FIXES.items():
-        e = re.sub(bad, good, e)
-    return e
-
-def to_dt(x):
-    try:
-        return pd.to_datetime(x, errors="coerce")
-    except Exception:
-        return pd.NaT
-
-def load_attendance(path):
-    df = pd.read_csv(path)
-    cols = {c.lower(): c for c in df.columns}
+    return _EMAIL_FIX_RE.sub(_fix_domain, e)
+
+def norm_key(s):
+    # Key/label columns as trimmed Arrow strings in one kernel pass; missing stays <NA>
+    if s.dtype != "string[pyarrow]":
+        s = s.astype("string[pyarrow]")
+    return s.str.strip()
+
+def normalize_email_series(s):
+    # Column-wise normalize_email. Each student's address repeats once per lecture,
+    # so normalize the distinct values only and broadcast back by factorize codes
+    codes, uniques = pd.factorize(s)
+    u = pd.Series(uniques, dtype="string[pyarrow]")
+    u = u.str.strip().str.lower().str.replace(" ", "", regex=False)
+    # Pattern-string contains on Arrow strings runs in RE2 (a DFA), so the common
+    # no-typo case is rejected without Python; only matching rows pay for the sub
+    needs_fix = u.str.contains(_EMAIL_FIX_PREFILTER, regex=True, na=False)
+    if needs_fix.any():
+        u = u.mask(needs_fix, u[needs_fix].str.replace(_EMAIL_FIX_RE, _fix_domain, regex=True))
+    # Missing cells have code -1 and come back <NA>
+    return pd.Series(u.array.take(codes, allow_fill=True), index=s.index, name=s.name)
+
+# Timestamp layouts seen in Google Forms / Zoom exports; parsed natively by Arrow
+ATTENDANCE_TS_FORMATS = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S"]
+ATTENDANCE_TS_PARSERS = ATTENDANCE_TS_FORMATS + [pacsv.ISO8601]
+
+def parse_attendance_timestamps(s):
+    # Known layouts through pandas' vectorized fixed-format parser; only the values
+    # none of them match pay for the per-value "mixed" parser
+    ts = pd.Series(pd.NaT, index=s.index, dtype="datetime64[us]")
+    for fmt in ATTENDANCE_TS_FORMATS + ["mixed"]:
+        todo = ts.isna() & s.notna()
+        if not todo.any():
+            break
+        parsed = pd.to_datetime(s[todo], errors="coerce", format=fmt)
+        if parsed.dt.tz is not None:
+            # Offset-stamped values keep their wall-clock time, like the naive layouts
+            parsed = parsed.dt.tz_localize(None)
+        ts[todo] = parsed
+    return ts
+
+def detect_attendance_columns(names):
+    cols = {c.lower(): c for c in names}
     ts_col = next((cols[k] for k in cols if "timestamp" in k), None)
     email_col = next((cols[k] for k in cols if k.strip() == "email"), None)
     id_col = next((cols[k] for k in cols if k.strip() == "id"), None)
     name_col = next((cols[k] for k in cols if "name" in k), None)
     if ts_col is None or (email_col is None and id_col is None):
         raise ValueError("Attendance CSV must have at least Timestamp + (email or ID) columns.")
-    df["__ts"] = df[ts_col].map(to_dt)
-    df["__date"] = df["__ts"].dt.date
-    df["__email"] = df[email_col].map(normalize_email) if email_col else np.nan
-    df["__id"] = df[id_col].astype(str).str.strip() if id_col else np.nan
-    df["__name"] = df[name_col].astype(str).str.strip() if name_col else np.nan
+    return ts_col, email_col, id_col, name_col
+
+def _read_attendance_header(path):
+    # pandas names repeated headers "Name", "Name.1"; every reader below uses those names
+    header = list(pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns)
+    cols = detect_attendance_columns(header)
+    return header, cols, list(dict.fromkeys(c for c in cols if c))
+
+def _add_identity_columns(df, ts, emails, ids, names):
+    df["__ts"] = ts
+    # object dtype even when every timestamp is NaT, so date comparisons stay valid
+    df["__date"] = df["__ts"].dt.date.astype(object)
+    # Blank cells are missing on every load path, never a "" identity
+    df["__email"] = normalize_email_series(emails).replace("", pd.NA) if emails is not None else np.nan
+    df["__id"] = norm_key(ids).replace("", pd.NA) if ids is not None else np.nan
+    df["__name"] = norm_key(names).replace("", pd.NA) if names is not None else np.nan
     df["__identity"] = np.where(df["__id"].notna() & (df["__id"] != ""), df["__id"],
                          np.where(df["__email"].notna() & (df["__email"] != ""), df["__email"], df["__name"]))
+    # Group/crosstab/merge on int codes rather than hashing each string per row
+    df["__identity"] = df["__identity"].astype("category")
     return df
 
+def _attendance_frame(df, ts, cols):
+    ts_col, email_col, id_col, name_col = cols
+    return _add_identity_columns(
+        df, ts,
+        df[email_col] if email_col else None,
+        df[id_col] if id_col else None,
+        df[name_col] if name_col else None,
+    )
+
+def _arrow_attendance_options(header, cols, usecols, block_size):
+    # Keys are compared as text, so never let Arrow infer them (e.g. 0000001 -> 1);
+    # only the four used columns are converted, free-text answers are skipped
+    key_types = {c: pa.string() for c in cols[1:] if c}
+    return dict(
+        read_options=pacsv.ReadOptions(column_names=header, skip_rows=1, block_size=block_size),
+        convert_options=pacsv.ConvertOptions(include_columns=usecols, column_types=key_types,
+                                             timestamp_parsers=ATTENDANCE_TS_PARSERS),
+    )
+
+def _arrow_attendance_frame(table, cols):
+    ts = table.column(cols[0])
+    if pa.types.is_timestamp(ts.type):
+        ts = ts.to_pandas()
+    else:
+        # A value outside ATTENDANCE_TS_PARSERS left the column as text
+        ts = parse_attendance_timestamps(ts.to_pandas())
+    return _attendance_frame(table.to_pandas(), ts, cols)
+
+def _pandas_attendance_frame(df, cols):
+    return _attendance_frame(df, parse_attendance_timestamps(df[cols[0]]), cols)
+
+def _read_attendance_pandas(path, usecols, chunksize=None):
+    return pd.read_csv(path, encoding="utf-8-sig", usecols=usecols,
+                       dtype="string[pyarrow]", chunksize=chunksize)
+
+def load_attendance(path):
+    header, cols, usecols = _read_attendance_header(path)
+    try:
+        table = pacsv.read_csv(path, **_arrow_attendance_options(header, cols, usecols, 8 << 20))
+    except pa.ArrowInvalid:
+        # Ragged exports (rows with fewer cells than the header): pandas pads them with NaN
+        return _pandas_attendance_frame(_read_attendance_pandas(path, usecols), cols)
+    return _arrow_attendance_frame(table, cols)
+
+# The only gradebook columns the join and output use; everything else is skipped at parse time
+GRADEBOOK_COLUMNS = ["Student", "ID", "SIS Login ID", "Email"]
+
 def load_gradebook_csv(path):
+    opts = dict(dtype="string[pyarrow]", usecols=lambda c: c in GRADEBOOK_COLUMNS)
     try:
-        gb = pd.read_csv(path, encoding="utf-8-sig")
+        gb = pd.read_csv(path, encoding="utf-8-sig", **opts)
     except Exception:
-        gb = pd.read_csv(path, encoding="latin-1")
+        gb = pd.read_csv(path, encoding="latin-1", **opts)
     # Normalize potential keys
     if "Email" in gb.columns:
-        gb["Email_norm"] = gb["Email"].map(normalize_email)
+        gb["Email_norm"] = normalize_email_series(gb["Email"])
     if "SIS Login ID" in gb.columns:
-        gb["SIS Login ID_norm"] = gb["SIS Login ID"].map(normalize_email)
+        gb["SIS Login ID_norm"] = normalize_email_series(gb["SIS Login ID"])
     if "ID" in gb.columns:
-        gb["ID_str"] = gb["ID"].astype(str).str.strip()
+        gb["ID_str"] = norm_key(gb["ID"])
     # Display name
     if "Student" in gb.columns:
-        gb["__disp_name"] = gb["Student"].astype(str).str.strip()
+        gb["__disp_name"] = norm_key(gb["Student"])
     else:
         gb["__disp_name"] = np.nan
     return gb
@@ -130,24 +230,83 @@ def load_gradebook_csv(path):
 def filter_weeks(df, start_iso, end_iso):
     start = pd.to_datetime(start_iso).date()
     end   = pd.to_datetime(end_iso).date()
-    return df.loc[(df["__date"] >= start) & (df["__date"] <= end)].copy()
+    out = df.loc[(df["__date"] >= start) & (df["__date"] <= end)].copy()
+    if isinstance(out["__identity"].dtype, pd.CategoricalDtype):
+        # Students with no check-ins in the window must not surface as empty groups
+        out["__identity"] = out["__identity"].cat.remove_unused_categories()
+    return out
 
 def dedup_same_day(df):
-    df = df.sort_values(["__date", "__ts"], ascending=[True, True])
-    return df.drop_duplicates(subset=["__identity", "__date"], keep="first")
+    # Earliest check-in per (identity, date) without a full-frame sort
+    idx = df.groupby(["__identity", "__date"], sort=False, dropna=False, observed=True)["__ts"].idxmin()
+    return df.loc[idx].reset_index(drop=True)
+
+# Above this size attendance is streamed in chunks instead of parsed in one go
+ATTENDANCE_CHUNKED_BYTES = 64_000_000
+# Arrow block size when streaming: each block is parsed into one record batch
+ATTENDANCE_CHUNK_BYTES = 16 << 20
+# Rows per chunk when a ragged export has to be streamed through pandas instead
+ATTENDANCE_CHUNK_ROWS = 200_000
+
+def iter_attendance_chunks(path, block_size=ATTENDANCE_CHUNK_BYTES):
+    header, cols, usecols = _read_attendance_header(path)
+    # Column types are fixed by the first block, so a later block that doesn't
+    # fit them (ragged row, odd timestamp) raises ArrowInvalid mid-stream
+    reader = pacsv.open_csv(path, **_arrow_attendance_options(header, cols, usecols, block_size))
+    for batch in reader:
+        yield _arrow_attendance_frame(batch, cols)
+
+def iter_attendance_chunks_pandas(path, chunksize=ATTENDANCE_CHUNK_ROWS):
+    header, cols, usecols = _read_attendance_header(path)
+    for chunk in _read_attendance_pandas(path, usecols, chunksize):
+        yield _pandas_attendance_frame(chunk, cols)
+
+def _fold_attendance_window(chunks, start_iso, end_iso):
+    # Earliest-per-(identity, date) is associative, so folding each filtered chunk
+    # into the running result matches deduping the whole file; the running result
+    # is bounded by students x lecture days rather than by file size
+    window = None
+    for chunk in chunks:
+        # Rows without a parseable timestamp (e.g. trailing ",,," rows) can never be in the window
+        chunk = filter_weeks(chunk[chunk["__ts"].notna()], start_iso, end_iso)
+        window = chunk if window is None else pd.concat([window, chunk], ignore_index=True)
+        window = dedup_same_day(window)
+    window["__identity"] = window["__identity"].astype("category")
+    return window
+
+def load_attendance_window(path, start_iso, end_iso):
+    # Attendance rows inside [start, end] with one (earliest) row per identity and day
+    if os.path.getsize(path) < ATTENDANCE_CHUNKED_BYTES:
+        return dedup_same_day(filter_weeks(load_attendance(path), start_iso, end_iso))
+    # A file this size always yields at least one chunk
+    try:
+        return _fold_attendance_window(iter_attendance_chunks(path), start_iso, end_iso)
+    except pa.ArrowInvalid:
+        return _fold_attendance_window(iter_attendance_chunks_pandas(path), start_iso, end_iso)
 
 def compute_counts(df_weeks):
-    lecture_dates = sorted(pd.Series(df_weeks["__date"].unique()).dropna().tolist())
-    cnt = df_weeks.groupby(["__identity"]).agg(
-        attended_dates=("__date", lambda s: sorted(set(s)))
-    ).reset_index()
-    cnt["total_count"] = cnt["attended_dates"].map(len)
+    dates = pd.to_datetime(df_weeks["__date"]).to_numpy().astype("datetime64[D]")
+    # np.unique sorts in C; datetime64[D] -> object yields datetime.date
+    lecture_dates = np.unique(dates[~np.isnat(dates)]).astype(object).tolist()
     week1 = lecture_dates[:3] if len(lecture_dates) >= 3 else lecture_dates
     week2 = lecture_dates[3:6] if len(lecture_dates) >= 6 else lecture_dates[3:]
-    def count_in_week(dates, week):
-        return sum(1 for d in dates if d in week)
-    cnt["week1_count"] = cnt["attended_dates"].map(lambda ds: count_in_week(ds, week1))
-    cnt["week2_count"] = cnt["attended_dates"].map(lambda ds: count_in_week(ds, week2))
+    # dedup_same_day leaves one row per (identity, date), so per-student sums of
+    # week-membership masks are the week counts and group sizes are the totals
+    w1_mask = np.isin(dates, np.array(week1, dtype="datetime64[D]"))
+    w2_mask = np.isin(dates, np.array(week2, dtype="datetime64[D]"))
+    codes, idents = pd.factorize(df_weeks["__identity"], sort=True)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]  # NaN identities are not counted
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    def per_student(mask):
+        return np.add.reduceat(mask[order].astype(np.int32), starts)
+    cnt = pd.DataFrame({
+        "__identity": idents.take(sorted_codes[starts]),
+        "total_count": np.diff(np.r_[starts, len(order)]),
+        "week1_count": per_student(w1_mask),
+        "week2_count": per_student(w2_mask),
+    })
     cnt["max_possible"] = 6
     cnt["percentage"] = (cnt["week1_count"] + cnt["week2_count"]) / cnt["max_possible"] * 100.0
     mini = df_weeks.sort_values("__ts").drop_duplicates("__identity", keep="first")["__identity"].to_frame()
@@ -156,57 +315,82 @@ def compute_counts(df_weeks):
     return out, lecture_dates, week1, week2
 
 def try_join_modes(counts_out, roster):
-    # Return the join with best match coverage
-    def join_id():
-        if "ID_str" not in roster.columns: return None, 0.0
-        x = counts_out.copy()
-        x["__id"] = x["__id"].astype(str).str.strip()
-        m = roster.merge(x, left_on="ID_str", right_on="__id", how="left")
-        matched = (~m["week1_count"].isna()).mean() * 100.0
-        return m, matched
-    def join_email():
-        x = counts_out.copy()
-        x["__email_norm"] = x["__email"].map(normalize_email)
-        if "SIS Login ID_norm" in roster.columns:
-            m = roster.merge(x, left_on="SIS Login ID_norm", right_on="__email_norm", how="left")
-        elif "Email_norm" in roster.columns:
-            m = roster.merge(x, left_on="Email_norm", right_on="__email_norm", how="left")
-        else:
-            return None, 0.0
-        matched = (~m["week1_count"].isna()).mean() * 100.0
-        return m, matched
-    id_m, id_cov = join_id()
-    em_m, em_cov = join_email()
-    if em_cov >= id_cov:
-        return em_m, "email", em_cov
-    else:
-        return id_m, "id", id_cov
+    # Return the join with best match coverage: score each available key by
+    # membership first, then merge only once on the winner
+    x = counts_out.copy()
+    candidates = []
+    email_key = next((k for k in ["SIS Login ID_norm", "Email_norm"] if k in roster.columns), None)
+    if email_key is not None:
+        x["__email_norm"] = normalize_email_series(x["__email"])
+        candidates.append(("email", email_key, "__email_norm"))
+    if "ID_str" in roster.columns:
+        x["__id"] = norm_key(x["__id"])
+        candidates.append(("id", "ID_str", "__id"))
+    if not candidates:
+        return None, "email", 0.0
+    # dropna: isin treats <NA> as equal to <NA>, which would count blank roster keys
+    # (e.g. Canvas's "Points Possible" row) as matched
+    scored = [(mode, left, right, roster[left].isin(x[right].dropna()).mean() * 100.0)
+              for mode, left, right in candidates]
+    # max() keeps the first of equal scores, so email wins ties as before
+    mode, left, right, cov = max(scored, key=lambda c: c[3])
+    merged = roster.merge(x, left_on=left, right_on=right, how="left")
+    return merged, mode, cov
+
+OUTPUT_NUMERIC_COLUMNS = ["week1_count","week2_count","total_count","percentage"]
 
 def finalize_output(merged):
-    # Fill zeros
-    for col in ["week1_count","week2_count","total_count","percentage"]:
-        if col in merged.columns:
-            merged[col] = pd.to_numeric(merged[col], errors="coerce").fillna(0.0)
+    # Fill zeros in one block assignment; counts are whole numbers so store them as int32
+    nums = [c for c in OUTPUT_NUMERIC_COLUMNS if c in merged.columns]
+    if nums:
+        merged[nums] = merged[nums].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+        merged = merged.astype({c: "int32" for c in nums if c != "percentage"})
     if "max_possible" in merged.columns:
-        merged["max_possible"] = pd.to_numeric(merged["max_possible"], errors="coerce").fillna(6.0)
+        merged["max_possible"] = pd.to_numeric(merged["max_possible"], errors="coerce").fillna(6).astype("int32")
     name_col = "__disp_name" if "__disp_name" in merged.columns else "__name"
     keep = [c for c in [name_col,"ID_str","SIS Login ID","Email","week1_count","week2_count","total_count","max_possible","percentage"] if c in merged.columns]
     out = merged[keep].rename(columns={name_col:"Student","ID_str":"ID"})
     return out
 
-def write_csv(df, path):
-    df.to_csv(path, index=False)
+CSV_CHUNK_ROWS = 10_000
+
+def iter_csv_chunks(df, chunksize=CSV_CHUNK_ROWS):
+    # Serialized CSV text, chunksize rows at a time; header only on the first chunk
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize].to_csv(index=False, header=(start == 0))
+
+def write_csv(df, path, chunksize=CSV_CHUNK_ROWS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for chunk in iter_csv_chunks(df, chunksize):
+            f.write(chunk)
     LOGGER.info(f"Wrote: {path}")
 
+def write_artifact(df, path, with_csv=True):
+    # Parquet is the primary artifact; the CSV twin is only for Canvas upload
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    df.to_parquet(parquet_path, index=False, compression="zstd")
+    LOGGER.info(f"Wrote: {parquet_path}")
+    if with_csv:
+        write_csv(df, path)
+    return parquet_path
+
+def write_feather(df, path):
+    # Uncompressed Feather v2 so read_feather can memory-map it without decoding
+    df.reset_index(drop=True).to_feather(path, compression="uncompressed")
+    LOGGER.info(f"Wrote: {path}")
+
+def read_feather(path):
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
 def write_matrix(df_weeks, six_dates, out_path):
+    # Rows with no email/ID/name are not students (compute_counts skips them too)
+    df_weeks = df_weeks[df_weeks["__identity"].notna()]
     mini = df_weeks.sort_values("__ts").drop_duplicates("__identity", keep="first")[["__identity","__name","__id","__email"]]
-    att_ids = df_weeks[["__identity","__date"]].drop_duplicates().assign(val=1)
-    pivot = att_ids.pivot_table(index="__identity", columns="__date", values="val", fill_value=0)
-    for d in six_dates:
-        if d not in pivot.columns:
-            pivot[d] = 0
-    pivot = pivot[six_dates]
-    mat = mini.merge(pivot.reset_index(), on="__identity", how="left").fillna(0)
+    pivot = pd.crosstab(df_weeks["__identity"], df_weeks["__date"]).clip(upper=1)
+    pivot = pivot.reindex(columns=six_dates, fill_value=0)
+    mat = mini.merge(pivot.reset_index(), on="__identity", how="left")
+    mat[six_dates] = mat[six_dates].fillna(0)
     mat["total_count"] = mat[six_dates].sum(axis=1)
     mat["max_possible"] = 6
     mat["percentage"] = mat["total_count"] / mat["max_possible"] * 100
@@ -226,8 +410,7 @@ def qa_report(out_df, roster_len):
     LOGGER.info(f"QA: rows={rows} (roster={roster_len}), >0 totals={nz} ({cov:.1f}%), max: w1={w1max}, w2={w2max}, total={tmax}")
 
 def cmd_process(args):
-    att = load_attendance(args.attendance)
-    att_w12 = dedup_same_day(filter_weeks(att, args.start, args.end))
+    att_w12 = load_attendance_window(args.attendance, args.start, args.end)
     counts_out, lecture_dates, week1, week2 = compute_counts(att_w12)
     six = (week1 + week2)[:6]
     if args.gradebook:
@@ -236,10 +419,10 @@ def cmd_process(args):
             merged, mode, cov = try_join_modes(counts_out, roster)
             LOGGER.info(f"Auto-join picked: {mode} (coverage={cov:.1f}%)")
         elif args.join == "id":
-            counts_out["__id"] = counts_out["__id"].astype(str).str.strip()
+            counts_out["__id"] = norm_key(counts_out["__id"])
             merged = roster.merge(counts_out, left_on="ID_str", right_on="__id", how="left")
         elif args.join == "email":
-            counts_out["__email_norm"] = counts_out["__email"].map(normalize_email)
+            counts_out["__email_norm"] = normalize_email_series(counts_out["__email"])
             if "SIS Login ID_norm" in roster.columns:
                 merged = roster.merge(counts_out, left_on="SIS Login ID_norm", right_on="__email_norm", how="left")
             else:
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
 from pathlib import Path
 from typing import List
@@ -15,6 +18,8 @@ class Settings(BaseSettings):
     debug: bool = True
     upload_dir: Path = Path("storage/uploads")
     output_dir: Path = Path("storage/outputs")
+    # Each worker holds its own pandas/pyarrow imports and parse cache, so keep the pool small
+    cpu_workers: int = min(2, os.cpu_count() or 1)
     allowed_origins: List[str] = [
         "http://localhost:5173",
         "http://127.0.0.1:5173",
@@ -31,3 +36,26 @@ def get_settings() -> Settings:
     settings = Settings()
     settings.ensure_directories()
     return settings
+
+
+@lru_cache
+def get_cpu_executor() -> ProcessPoolExecutor:
+    # Dedicated pool for pandas work so it does not queue behind asyncio's default I/O threads.
+    # Workers come from a forkserver, never fork() of this already-threaded API process.
+    return ProcessPoolExecutor(
+        max_workers=get_settings().cpu_workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+    )
+
+
+def shutdown_cpu_executor(expected: ProcessPoolExecutor | None = None, wait: bool = True) -> None:
+    # Drop the cached pool so the next get_cpu_executor() starts a fresh one. With
+    # `expected`, only act if that pool is still current (another request may have
+    # already replaced a broken pool).
+    if not get_cpu_executor.cache_info().currsize:
+        return
+    executor = get_cpu_executor()
+    if expected is not None and executor is not expected:
+        return
+    get_cpu_executor.cache_clear()
+    executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
-from app.core.config import get_settings
+from app.core.config import get_settings, shutdown_cpu_executor
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    shutdown_cpu_executor()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    application = FastAPI(title=settings.app_name, debug=settings.debug)
+    application = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
 
     application.add_middleware(
         CORSMiddleware,
@@ -24,6 +24,8 @@ class AttendanceProcessResponse(BaseModel):
     summary: AttendanceSummary
     counts_preview: List[Dict[str, Any]] = Field(default_factory=list)
     counts_artifact: ProcessedArtifact
+    counts_parquet_artifact: Optional[ProcessedArtifact] = None
+    counts_feather_artifact: Optional[ProcessedArtifact] = None
     matrix_artifact: Optional[ProcessedArtifact] = None
 
 
@@ -1,28 +1,53 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 from uuid import uuid4
 
+import aiofiles
 import pandas as pd
 from fastapi import UploadFile
 
 from app.attendance_automator import (
-    dedup_same_day,
-    filter_weeks,
     finalize_output,
-    load_attendance,
+    load_attendance_window,
     load_gradebook_csv,
-    normalize_email,
+    norm_key,
+    normalize_email_series,
+    read_feather,
     try_join_modes,
-    write_csv,
+    write_artifact,
+    write_feather,
     write_matrix,
     compute_counts,
 )
 from app.schemas import AttendanceProcessResponse, AttendanceSummary, ProcessedArtifact
-from app.core.config import Settings
+from app.core.config import Settings, get_cpu_executor, shutdown_cpu_executor
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+# Uploads are stored under their content digest, so a path identifies its bytes
+# and repeat submissions of the same file skip parsing entirely.
+@lru_cache(maxsize=32)
+def _load_attendance_window_cached(path: Path, start_date: str, end_date: str) -> pd.DataFrame:
+    return load_attendance_window(path, start_date, end_date)
+
+
+@lru_cache(maxsize=32)
+def _load_gradebook_cached(path: Path) -> pd.DataFrame:
+    return load_gradebook_csv(path)
+
+
+def _run_processing_worker(settings: Settings, job: Dict[str, object]) -> AttendanceProcessResponse:
+    # Module-level so it can be pickled into the process pool
+    return AttendanceService(settings)._run_processing(**job)
 
 
 class AttendanceService:
@@ -42,17 +67,25 @@ class AttendanceService:
         attendance_path = await self._persist_upload(attendance_file)
         gradebook_path = await self._persist_upload(gradebook_file) if gradebook_file else None
 
-        result = await asyncio.get_event_loop().run_in_executor(
-            None,
-            self._run_processing,
-            attendance_path,
-            gradebook_path,
-            start_date,
-            end_date,
-            out_prefix,
-            join_mode,
-            matrix,
-        )
+        job = {
+            "attendance_path": attendance_path,
+            "gradebook_path": gradebook_path,
+            "start_date": start_date,
+            "end_date": end_date,
+            "out_prefix": out_prefix,
+            "join_mode": join_mode,
+            "matrix": matrix,
+        }
+        executor = get_cpu_executor()
+        try:
+            result = await asyncio.get_event_loop().run_in_executor(
+                executor, _run_processing_worker, self.settings, job
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM), most likely on this very upload: give later
+            # requests a fresh pool, but don't resubmit the job and take that one down too
+            shutdown_cpu_executor(expected=executor, wait=False)
+            raise
 
         return result
 
@@ -60,10 +93,20 @@ class AttendanceService:
         if upload is None:
             raise ValueError("Upload file expected but missing")
         suffix = Path(upload.filename or "upload.csv").suffix or ".csv"
-        dest = self.settings.upload_dir / f"{uuid4().hex}{suffix}"
-        contents = await upload.read()
-        dest.write_bytes(contents)
-        upload.file.close()
+        hasher = hashlib.blake2b(digest_size=16)
+        partial = self.settings.upload_dir / f"{uuid4().hex}.part"
+        try:
+            async with aiofiles.open(partial, "wb") as out:
+                while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    await out.write(chunk)
+        except BaseException:
+            # Client disconnect (cancellation), disk full, ...: don't leave the .part behind
+            partial.unlink(missing_ok=True)
+            raise
+        await upload.close()
+        dest = self.settings.upload_dir / f"{hasher.hexdigest()}{suffix}"
+        partial.replace(dest)
         return dest
 
     def _run_processing(
@@ -76,20 +119,19 @@ class AttendanceService:
         join_mode: str,
         matrix: bool,
     ) -> AttendanceProcessResponse:
-        attendance_df = load_attendance(attendance_path)
-        filtered = dedup_same_day(filter_weeks(attendance_df, start_date, end_date))
+        filtered = _load_attendance_window_cached(attendance_path, start_date, end_date).copy()
         counts_out, lecture_dates, week1, week2 = compute_counts(filtered)
         six_dates = (week1 + week2)[:6]
 
         if gradebook_path is not None:
-            roster = load_gradebook_csv(gradebook_path)
+            roster = _load_gradebook_cached(gradebook_path).copy()
             if join_mode == "auto":
                 merged, mode, coverage = try_join_modes(counts_out, roster)
             elif join_mode == "id":
-                counts_out["__id"] = counts_out["__id"].astype(str).str.strip()
+                counts_out["__id"] = norm_key(counts_out["__id"])
                 merged = roster.merge(counts_out, left_on="ID_str", right_on="__id", how="left")
             elif join_mode == "email":
-                counts_out["__email_norm"] = counts_out["__email"].map(normalize_email)
+                counts_out["__email_norm"] = normalize_email_series(counts_out["__email"])
                 if "SIS Login ID_norm" in roster.columns:
                     merged = roster.merge(counts_out, left_on="SIS Login ID_norm", right_on="__email_norm", how="left")
                 else:
@@ -106,7 +148,9 @@ class AttendanceService:
         safe_prefix = out_prefix or "attendance"
         counts_filename = f"{safe_prefix}_{timestamp}_attendance_counts.csv"
         counts_path = self.settings.output_dir / counts_filename
-        write_csv(output_df, counts_path)
+        counts_parquet_path = Path(write_artifact(output_df, counts_path))
+        counts_feather_path = counts_path.with_suffix(".feather")
+        write_feather(output_df, counts_feather_path)
 
         matrix_artifact: Optional[ProcessedArtifact] = None
         if matrix:
@@ -122,6 +166,14 @@ class AttendanceService:
             filename=counts_filename,
             relative_path=str(counts_path.relative_to(Path.cwd())),
         )
+        counts_parquet_artifact = ProcessedArtifact(
+            filename=counts_parquet_path.name,
+            relative_path=str(counts_parquet_path.relative_to(Path.cwd())),
+        )
+        counts_feather_artifact = ProcessedArtifact(
+            filename=counts_feather_path.name,
+            relative_path=str(counts_feather_path.relative_to(Path.cwd())),
+        )
 
         attendance_series = (
             output_df["total_count"].fillna(0) if "total_count" in output_df.columns else pd.Series([0] * len(output_df))
@@ -143,12 +195,32 @@ class AttendanceService:
             summary=summary,
             counts_preview=preview,
             counts_artifact=counts_artifact,
+            counts_parquet_artifact=counts_parquet_artifact,
+            counts_feather_artifact=counts_feather_artifact,
             matrix_artifact=matrix_artifact,
         )
 
+    def resolve_artifact(self, filename: str) -> Path:
+        output_dir = self.settings.output_dir.resolve()
+        path = (output_dir / filename).resolve()
+        if path.parent != output_dir or not path.is_file():
+            raise FileNotFoundError(filename)
+        return path
+
+    def artifact_preview(self, filename: str, limit: int = 20) -> List[Dict[str, object]]:
+        path = self.resolve_artifact(filename)
+        if path.suffix != ".feather":
+            raise ValueError("Only .feather artifacts can be previewed")
+        return self._build_preview(read_feather(path), limit)
+
     def _build_preview(self, df: pd.DataFrame, limit: int = 20) -> List[Dict[str, object]]:
-        preview_df = df.head(limit).copy()
-        for col in ["percentage"]:
-            if col in preview_df.columns:
-                preview_df[col] = preview_df[col].round(2)
-        return preview_df.fillna("").to_dict(orient="records")
+        # Column-wise native lists zipped into rows; no intermediate frame copy
+        head = df.head(limit)
+        columns = list(head.columns)
+        arrays = []
+        for col in columns:
+            values = head[col]
+            if col == "percentage":
+                values = values.round(2)
+            arrays.append(values.fillna("").tolist())
+        return [dict(zip(columns, row)) for row in zip(*arrays)]
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import type { FormEvent } from 'react'
-import { fetchHealth, fetchHistory, processAttendance } from './api/client'
+import { artifactUrl, fetchHealth, fetchHistory, processAttendance } from './api/client'
 import type { AttendanceProcessResponse, HistoryItem } from './types'
 
 const joinModeOptions = [
@@ -254,12 +254,38 @@ function App() {
                     <p className="text-xs font-semibold uppercase text-slate-500">Counts CSV</p>
                     <p className="text-sm text-slate-900">{result.counts_artifact.filename}</p>
                     <p className="text-xs text-slate-500">{result.counts_artifact.relative_path}</p>
+                    <a href={artifactUrl(result.counts_artifact)} className="text-xs font-semibold text-secondary hover:underline">
+                      Download
+                    </a>
                   </div>
+                  {result.counts_parquet_artifact && (
+                    <div className="rounded-2xl border border-slate-100 p-4">
+                      <p className="text-xs font-semibold uppercase text-slate-500">Counts Parquet</p>
+                      <p className="text-sm text-slate-900">{result.counts_parquet_artifact.filename}</p>
+                      <p className="text-xs text-slate-500">{result.counts_parquet_artifact.relative_path}</p>
+                      <a href={artifactUrl(result.counts_parquet_artifact)} className="text-xs font-semibold text-secondary hover:underline">
+                        Download
+                      </a>
+                    </div>
+                  )}
+                  {result.counts_feather_artifact && (
+                    <div className="rounded-2xl border border-slate-100 p-4">
+                      <p className="text-xs font-semibold uppercase text-slate-500">Counts Feather</p>
+                      <p className="text-sm text-slate-900">{result.counts_feather_artifact.filename}</p>
+                      <p className="text-xs text-slate-500">{result.counts_feather_artifact.relative_path}</p>
+                      <a href={artifactUrl(result.counts_feather_artifact)} className="text-xs font-semibold text-secondary hover:underline">
+                        Download
+                      </a>
+                    </div>
+                  )}
                   {result.matrix_artifact && (
                     <div className="rounded-2xl border border-slate-100 p-4">
                       <p className="text-xs font-semibold uppercase text-slate-500">Matrix CSV</p>
                       <p className="text-sm text-slate-900">{result.matrix_artifact.filename}</p>
                       <p className="text-xs text-slate-500">{result.matrix_artifact.relative_path}</p>
+                      <a href={artifactUrl(result.matrix_artifact)} className="text-xs font-semibold text-secondary hover:underline">
+                        Download
+                      </a>
                     </div>
                   )}
                 </div>
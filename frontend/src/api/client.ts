@@ -2,6 +2,7 @@ import type {
   AttendanceProcessResponse,
   HistoryResponse,
   ProcessAttendancePayload,
+  ProcessedArtifact,
 } from '../types'
 
 const API_BASE = import.meta.env.VITE_API_BASE ?? 'http://localhost:8000/api/v1'
@@ -33,6 +34,10 @@ export async function processAttendance(
   return response.json()
 }
 
+export function artifactUrl(artifact: ProcessedArtifact): string {
+  return `${API_BASE}/artifacts/${encodeURIComponent(artifact.filename)}`
+}
+
 export async function fetchHistory(): Promise<HistoryResponse> {
   const response = await fetch(`${API_BASE}/history`)
   if (!response.ok) {
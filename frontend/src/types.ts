@@ -16,6 +16,8 @@ export interface AttendanceProcessResponse {
   summary: AttendanceSummary
   counts_preview: Record<string, string | number>[]
   counts_artifact: ProcessedArtifact
+  counts_parquet_artifact?: ProcessedArtifact | null
+  counts_feather_artifact?: ProcessedArtifact | null
   matrix_artifact?: ProcessedArtifact | null
 }
 